@@ -19,11 +19,26 @@ Based on best practices from:
 import socket
 import json
 import time
+import queue
+import threading
 import numpy as np
 import configparser
 import os
+import functools
 from collections import deque
 
+# Optional: pyFFTW reuses a pre-planned FFT (falls back to numpy.fft)
+try:
+    import pyfftw
+except ImportError:
+    pyfftw = None
+
+# Optional: numba fuses spectral feature extraction into one compiled loop
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 # ============ CONFIGURATION ============
 # Load IP from config.ini
 config = configparser.ConfigParser()
@@ -43,8 +58,18 @@ MUSIC_PORT = 54321
 
 # Audio Analysis
 SAMPLE_RATE = 44100
-CHUNK_SIZE = 2048
+CHUNK_SIZE = 1024
 FFT_SIZE = CHUNK_SIZE
+HOP_SIZE = CHUNK_SIZE // 2  # 50% overlap between analysis frames
+BATCH_FRAMES = 1  # >1 buffers this many hops per FFT batch (adds latency)
+
+# Smoothing constants below were tuned for one frame per 2048 samples;
+# rescale them so the response time stays the same at HOP_SIZE
+FRAME_RATE_SCALE = 2048 / HOP_SIZE
+
+def per_hop(alpha):
+    """Rescale a per-frame EMA coefficient to the current frame rate"""
+    return 1 - (1 - alpha) ** (1 / FRAME_RATE_SCALE)
 
 # Frequency Bands (Hz)
 BASS_RANGE = (20, 250)
@@ -54,13 +79,21 @@ HIGH_RANGE = (2000, 8000)
 # Beat Detection
 BEAT_THRESHOLD = 1.35
 MIN_BEAT_INTERVAL = 0.16  # seconds
-ENERGY_HISTORY_SIZE = 48
+SILENCE_THRESHOLD = 1e-4  # RMS below this skips spectral analysis
+ENERGY_HISTORY_SIZE = int(48 * FRAME_RATE_SCALE)  # ~2.2s of frames
+NOISE_FLOOR_ALPHA = per_hop(0.01)
+PEAK_ATTACK_ALPHA = per_hop(0.34)
+PEAK_RELEASE_ALPHA = per_hop(0.02)
+BEAT_PULSE_DECAY = 1 - per_hop(0.12)
 
 # Smoothing (0-1, lower = smoother)
-HUE_ALPHA = 0.08      # Very smooth hue transitions
-SAT_ALPHA = 0.06      # Very smooth saturation
-BRIGHT_ALPHA = 0.10   # Smooth brightness
-BAND_ALPHA = 0.05     # Very smooth frequency bands
+HUE_ALPHA = per_hop(0.08)       # Very smooth hue transitions
+SAT_ALPHA = per_hop(0.06)       # Very smooth saturation
+BRIGHT_ALPHA = per_hop(0.10)    # Smooth brightness
+BAND_ALPHA = per_hop(0.05)      # Very smooth frequency bands
+CENTROID_ALPHA = per_hop(0.12)
+ROLLOFF_ALPHA = per_hop(0.10)
+INTENSITY_ALPHA = per_hop(0.18)
 
 # Brightness Range (adjust to your preference)
 MIN_BRIGHTNESS = 5
@@ -79,8 +112,8 @@ def get_local_ip():
     return ip
 
 def hann_window(n):
-    """Generate Hann window for FFT to reduce spectral leakage"""
-    return 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n) / (n - 1))
+    """Generate Hann window for FFT to reduce spectral leakage (float32 to match audio)"""
+    return (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n) / (n - 1))).astype(np.float32)
 
 def clamp(value, min_val, max_val):
     """Clamp value between min and max"""
@@ -102,41 +135,177 @@ def spectral_balance(a, b):
         return 0
     return clamp((a - b) / total, -1, 1)
 
+@functools.lru_cache(maxsize=4)
+def analysis_tables(frame_size):
+    """Window, bin-index table and FFT plan for a frame size (cached, so
+    re-creating AudioFeatures for a new sample rate reuses the FFTW plan)"""
+    window = hann_window(frame_size)
+    k = np.arange(frame_size // 2 + 1, dtype=np.float32)
+    for table in (window, k):
+        table.setflags(write=False)
+    
+    # Plan the FFT once and reuse it for every frame (single precision)
+    fft = None
+    if pyfftw is not None:
+        fft_in = pyfftw.empty_aligned(frame_size, dtype='float32')
+        fft_out = pyfftw.empty_aligned(frame_size // 2 + 1, dtype='complex64')
+        fft = pyfftw.FFTW(fft_in, fft_out,
+                          flags=('FFTW_MEASURE', 'FFTW_DESTROY_INPUT'),
+                          threads=1)
+    return window, k, fft
+
+def _spectral_sums_numpy(power, k, mag, bass_lo, bass_hi, mid_lo, mid_hi, high_lo, high_hi):
+    """Band energies, centroid sums and rolloff bin from a power spectrum,
+    or from a (n, bins) stack of spectra (one result per row).
+    Magnitudes are written into `mag` (None allocates); rolloff_idx is
+    the number of bins if the 85% crossing isn't found"""
+    bass = power[..., bass_lo:bass_hi].sum(axis=-1)
+    mid = power[..., mid_lo:mid_hi].sum(axis=-1)
+    high = power[..., high_lo:high_hi].sum(axis=-1)
+    magnitudes = np.sqrt(power, out=mag)
+    mag_sum = magnitudes.sum(axis=-1)
+    weighted = magnitudes @ k
+    # Band energy lies below high_hi, so the crossing is normally found
+    # there; when that energy is ~0 (e.g. content above HIGH_RANGE) the
+    # epsilon can push the target past it, so fall back to a full scan
+    target = np.expand_dims(0.85 * (bass + mid + high + 1e-9), -1)
+    rolloff_idx = (np.cumsum(power[..., :high_hi], axis=-1) < target).sum(axis=-1)
+    missed = rolloff_idx == high_hi
+    if np.any(missed):
+        full_idx = (np.cumsum(power, axis=-1) < target).sum(axis=-1)
+        rolloff_idx = np.where(missed, full_idx, rolloff_idx)
+    return bass, mid, high, mag_sum, weighted, rolloff_idx
+
+def _spectral_sums_loop(power, k, mag, bass_lo, bass_hi, mid_lo, mid_hi, high_lo, high_hi):
+    """Same as _spectral_sums_numpy, written as explicit loops for numba"""
+    n = power.shape[0]
+    bass = 0.0
+    mid = 0.0
+    high = 0.0
+    mag_sum = 0.0
+    weighted = 0.0
+    for i in range(n):
+        p = power[i]
+        if bass_lo <= i < bass_hi:
+            bass += p
+        elif mid_lo <= i < mid_hi:
+            mid += p
+        elif high_lo <= i < high_hi:
+            high += p
+        m = np.sqrt(p)
+        mag[i] = m
+        mag_sum += m
+        weighted += k[i] * m
+    
+    # Second pass: stop at the first bin where 85% of band energy is reached.
+    # This is normally below high_hi, but may lie past it (or nowhere) when
+    # band energy is ~0, so the scan covers the whole spectrum
+    target = 0.85 * (bass + mid + high + 1e-9)
+    running = 0.0
+    rolloff_idx = n
+    for i in range(n):
+        running += power[i]
+        if running >= target:
+            rolloff_idx = i
+            break
+    return bass, mid, high, mag_sum, weighted, rolloff_idx
+
+if njit is not None:
+    spectral_sums = njit(cache=True, fastmath=True)(_spectral_sums_loop)
+else:
+    spectral_sums = _spectral_sums_numpy
+
 
 class AudioFeatures:
     """DSP feature extraction from audio frames"""
     
+    __slots__ = (
+        'sample_rate', 'frame_size', 'window', 'freqs', 'band_width',
+        'bass_lo', 'bass_hi', 'mid_lo', 'mid_hi', 'high_lo', 'high_hi',
+        '_bands', '_k', '_bin_norm', '_fft', '_mag'
+    )
+    
     def __init__(self, sample_rate, frame_size):
         self.sample_rate = sample_rate
         self.frame_size = frame_size
-        self.window = hann_window(frame_size)
-        self.freqs = np.fft.rfftfreq(frame_size, 1/sample_rate)
+        self.window, self._k, self._fft = analysis_tables(frame_size)
+        self.freqs = np.fft.rfftfreq(frame_size, 1/sample_rate).astype(np.float32)
         self.band_width = sample_rate / frame_size
         
-        # Precompute band indices for efficiency
-        self.bass_mask = (self.freqs >= BASS_RANGE[0]) & (self.freqs < BASS_RANGE[1])
-        self.mid_mask = (self.freqs >= MID_RANGE[0]) & (self.freqs < MID_RANGE[1])
-        self.high_mask = (self.freqs >= HIGH_RANGE[0]) & (self.freqs < HIGH_RANGE[1])
+        # Precompute band indices for efficiency (freqs are sorted, so
+        # every band is a contiguous slice)
+        self.bass_lo, self.bass_hi = np.searchsorted(self.freqs, BASS_RANGE)
+        self.mid_lo, self.mid_hi = np.searchsorted(self.freqs, MID_RANGE)
+        self.high_lo, self.high_hi = np.searchsorted(self.freqs, HIGH_RANGE)
+        # Packed for the per-frame call: one attribute load instead of six
+        self._bands = (self.bass_lo, self.bass_hi, self.mid_lo, self.mid_hi,
+                       self.high_lo, self.high_hi)
+        
+        # Bin indices: freqs[k] = k * sample_rate / frame_size, so normalizing
+        # by Nyquist reduces to 2 * k / frame_size
+        self._bin_norm = 2.0 / frame_size
+        
+        # Reusable magnitude buffer
+        self._mag = np.empty(frame_size // 2 + 1, dtype=np.float32)
     
     def process(self, audio):
         """Extract audio features from frame"""
         if len(audio) != self.frame_size:
             return None
         
-        # Apply Hann window before FFT
-        windowed = audio * self.window
+        fft = self._fft
         
-        # FFT
-        spectrum = np.fft.rfft(windowed)
-        magnitudes = np.abs(spectrum)
+        # Keep the whole pipeline in single precision
+        audio = audio.astype(np.float32, copy=False)
         
         # RMS (root mean square) for volume
-        rms = np.sqrt(np.mean(audio ** 2))
+        rms = np.sqrt(np.dot(audio, audio) / len(audio))
+        
+        # Nothing to analyze in silence; skip the FFT entirely
+        if rms < SILENCE_THRESHOLD:
+            return {'rms': rms, 'silent': True}
+        
+        # Apply Hann window, then FFT (planned pyFFTW if available)
+        if fft is not None:
+            np.multiply(audio, self.window, out=fft.input_array)
+            spectrum = fft()
+        else:
+            spectrum = np.fft.rfft(audio * self.window).astype(np.complex64, copy=False)
+        
+        # Power spectrum computed once and shared by all features
+        power = spectrum.real * spectrum.real + spectrum.imag * spectrum.imag
         
-        # Band energies
-        bass = np.sum(magnitudes[self.bass_mask] ** 2)
-        mid = np.sum(magnitudes[self.mid_mask] ** 2)
-        high = np.sum(magnitudes[self.high_mask] ** 2)
+        # Band energies, centroid sums and rolloff in one pass
+        bass, mid, high, mag_sum, weighted, rolloff_idx = spectral_sums(
+            power, self._k, self._mag, *self._bands
+        )
+        return self._to_dict(rms, bass, mid, high, mag_sum, weighted, rolloff_idx)
+    
+    def process_batch(self, frames):
+        """Extract audio features from each row of a (n, frame_size) array"""
+        if frames.shape[1] != self.frame_size:
+            return None
+        
+        frames = frames.astype(np.float32, copy=False)
+        rms = np.sqrt(np.einsum('ij,ij->i', frames, frames) / self.frame_size)
+        
+        # One batched FFT, then the shared reductions across all rows
+        spectra = np.fft.rfft(frames * self.window, axis=1).astype(np.complex64, copy=False)
+        power = spectra.real * spectra.real + spectra.imag * spectra.imag
+        bass, mid, high, mag_sum, weighted, rolloff_idx = _spectral_sums_numpy(
+            power, self._k, None, *self._bands
+        )
+        
+        return [
+            {'rms': rms[i], 'silent': True} if rms[i] < SILENCE_THRESHOLD else
+            self._to_dict(rms[i], bass[i], mid[i], high[i],
+                          mag_sum[i], weighted[i], int(rolloff_idx[i]))
+            for i in range(len(frames))
+        ]
+    
+    def _to_dict(self, rms, bass, mid, high, mag_sum, weighted, rolloff_idx):
+        """Normalize raw spectral sums into the feature dict"""
+        bin_norm = self._bin_norm
         total_energy = bass + mid + high + 1e-9
         
         # Normalized band energies (0-1)
@@ -145,29 +314,21 @@ class AudioFeatures:
         high_norm = clamp(high / total_energy, 0, 1)
         
         # Spectral centroid (indicates "brightness" of sound)
-        mag_sum = np.sum(magnitudes) + 1e-9
-        centroid = np.sum(self.freqs * magnitudes) / mag_sum
-        centroid_norm = clamp(centroid / (self.sample_rate / 2), 0, 1)
+        centroid_norm = clamp(bin_norm * weighted / (mag_sum + 1e-9), 0, 1)
         
         # Spectral rolloff (frequency below which 85% of energy exists)
-        cumsum = np.cumsum(magnitudes ** 2)
-        rolloff_idx = np.searchsorted(cumsum, 0.85 * total_energy)
-        rolloff = self.freqs[min(rolloff_idx, len(self.freqs) - 1)]
-        rolloff_norm = clamp(rolloff / (self.sample_rate / 2), 0, 1)
-        
-        # Peak frequency
-        peak_idx = np.argmax(magnitudes)
-        peak_freq = self.freqs[peak_idx]
+        rolloff_idx = min(int(rolloff_idx), len(self._k) - 1)
+        rolloff_norm = clamp(bin_norm * rolloff_idx, 0, 1)
         
         return {
             'rms': rms,
+            'silent': False,
             'total_energy': total_energy,
             'bass': bass_norm,
             'mid': mid_norm,
             'high': high_norm,
             'centroid': centroid_norm,
-            'rolloff': rolloff_norm,
-            'peak_freq': peak_freq
+            'rolloff': rolloff_norm
         }
 
 
@@ -175,34 +336,42 @@ class BeatDetector:
     """Beat detection using energy comparison with adaptive threshold"""
     
     def __init__(self):
-        self.energy_history = deque(maxlen=ENERGY_HISTORY_SIZE)
+        # Ring buffer with a running sum so the average is O(1)
+        self.energy_history = [0.0] * ENERGY_HISTORY_SIZE
+        self.history_idx = 0
+        self.history_count = 0
+        self.history_sum = 0.0
         self.last_beat_time = 0
         self.peak_energy = 0.01
         self.noise_floor = 0.001
     
-    def detect(self, rms):
-        """Detect beat in current frame. Returns (is_beat, beat_strength)"""
-        now = time.time()
-        
+    def detect(self, rms, now):
+        """Detect beat in current frame at time `now`. Returns (is_beat, beat_strength)"""
         # Update noise floor and peak (adaptive)
-        self.noise_floor = ema(self.noise_floor, rms, 0.01)
+        self.noise_floor = ema(self.noise_floor, rms, NOISE_FLOOR_ALPHA)
         if rms > self.peak_energy:
-            self.peak_energy = ema(self.peak_energy, rms, 0.34)
+            self.peak_energy = ema(self.peak_energy, rms, PEAK_ATTACK_ALPHA)
         else:
-            self.peak_energy = ema(self.peak_energy, rms, 0.02)
+            self.peak_energy = ema(self.peak_energy, rms, PEAK_RELEASE_ALPHA)
         
         min_peak = self.noise_floor * 1.5
         if self.peak_energy < min_peak:
             self.peak_energy = min_peak
         
-        # Add to history
-        self.energy_history.append(rms)
+        # Add to history (overwrites the oldest entry once full)
+        rms = float(rms)
+        idx = self.history_idx
+        self.history_sum += rms - self.energy_history[idx]
+        self.energy_history[idx] = rms
+        self.history_idx = (idx + 1) % ENERGY_HISTORY_SIZE
+        if self.history_count < ENERGY_HISTORY_SIZE:
+            self.history_count += 1
         
         # Need enough history for comparison
-        if len(self.energy_history) < ENERGY_HISTORY_SIZE // 2:
+        if self.history_count < ENERGY_HISTORY_SIZE // 2:
             return False, 0
         
-        avg_energy = np.mean(self.energy_history)
+        avg_energy = self.history_sum / self.history_count
         
         # Check beat conditions
         if now - self.last_beat_time < MIN_BEAT_INTERVAL:
@@ -233,10 +402,8 @@ class PatternAnalyzer:
         self.beat_times = deque(maxlen=20)
         self.mode_hold_time = 2.5  # seconds before mode can switch
     
-    def process(self, features, is_beat, beat_strength):
-        """Analyze features and return pattern state"""
-        now = time.time()
-        
+    def process(self, features, is_beat, beat_strength, now):
+        """Analyze features at time `now` and return pattern state"""
         if is_beat:
             self.beat_times.append(now)
         
@@ -256,7 +423,7 @@ class PatternAnalyzer:
             0.1 * features['centroid'],
             0, 1
         )
-        self.intensity = ema(self.intensity, instant_intensity, 0.18)
+        self.intensity = ema(self.intensity, instant_intensity, INTENSITY_ALPHA)
         
         # Automatic mode switching based on audio characteristics
         if now - self.last_mode_switch > self.mode_hold_time:
@@ -305,14 +472,15 @@ class LEDController:
         if is_beat:
             self.beat_pulse = clamp(beat_strength * 1.2, 0, 1)
         else:
-            self.beat_pulse *= 0.88
+            self.beat_pulse *= BEAT_PULSE_DECAY
         
-        # Smooth band values using EMA
+        # Smooth band values using EMA (plain scalar math: for five values
+        # this is faster than building and unpacking a numpy array)
         self.bass = ema(self.bass, features['bass'], BAND_ALPHA)
         self.mid = ema(self.mid, features['mid'], BAND_ALPHA)
         self.high = ema(self.high, features['high'], BAND_ALPHA)
-        self.centroid = ema(self.centroid, features['centroid'], 0.12)
-        self.rolloff = ema(self.rolloff, features['rolloff'], 0.1)
+        self.centroid = ema(self.centroid, features['centroid'], CENTROID_ALPHA)
+        self.rolloff = ema(self.rolloff, features['rolloff'], ROLLOFF_ALPHA)
         
         # Spectral balance for color decisions
         low_mid_balance = spectral_balance(self.bass, self.mid)
@@ -379,9 +547,22 @@ class YeelightMusicSync:
         self.server = None
         self.last_command = 0
         self.min_command_interval = 0.06  # 60ms for smooth transitions
+        self.refresh_interval = 0.5  # resend unchanged values this often
+        self.last_refresh = 0  # last time both set_hsv and set_bright went out
+        
+        # Frame clock: time is derived from the number of analyzed hops,
+        # anchored to a single monotonic reading at startup
+        self.clock_start = time.monotonic()
+        self.frame_idx = 0
+        
+        # Outgoing commands are sent from a background thread so network
+        # stalls never block audio capture (drop-oldest when full)
+        self._tx_q = queue.Queue(maxsize=2)
+        self._tx_thread = None
         
         # Components
         self.features = AudioFeatures(SAMPLE_RATE, CHUNK_SIZE)
+        self.frame = np.zeros(CHUNK_SIZE, dtype=np.float32)  # sliding analysis window
         self.beat_detector = BeatDetector()
         self.pattern = PatternAnalyzer()
         self.led = LEDController()
@@ -402,7 +583,7 @@ class YeelightMusicSync:
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         sock.settimeout(5)
         sock.connect((LIGHT_IP, LIGHT_PORT))
-        sock.send((cmd + '\r\n').encode())
+        sock.sendall((cmd + '\r\n').encode())
         response = sock.recv(1024).decode()
         sock.close()
         
@@ -422,6 +603,14 @@ class YeelightMusicSync:
                 return False
             
             print(f"Light connected from {addr}!", flush=True)
+            
+            # Disable Nagle so small commands go out immediately, and keep
+            # the send buffer small so stale commands can't pile up
+            self.music_conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.music_conn.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+            
+            self._tx_thread = threading.Thread(target=self._send_loop, daemon=True)
+            self._tx_thread.start()
             return True
         except socket.timeout:
             print("Light did not connect (timeout)", flush=True)
@@ -430,6 +619,11 @@ class YeelightMusicSync:
     
     def disable_music_mode(self):
         """Disable music mode and cleanup"""
+        if self._tx_thread:
+            self._enqueue(None)
+            self._tx_thread.join(timeout=1)
+            self._tx_thread = None
+        
         try:
             if self.music_conn:
                 self.music_conn.close()
@@ -443,7 +637,7 @@ class YeelightMusicSync:
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             sock.settimeout(3)
             sock.connect((LIGHT_IP, LIGHT_PORT))
-            sock.send((cmd + '\r\n').encode())
+            sock.sendall((cmd + '\r\n').encode())
             sock.recv(1024)
             sock.close()
         except:
@@ -451,71 +645,127 @@ class YeelightMusicSync:
         
         print("Music mode disabled", flush=True)
     
-    def send_hsv(self, hue, sat, bright):
+    def send_hsv(self, hue, sat, bright, now):
         """Send HSV command via music mode connection"""
         if not self.music_conn:
             return
         
-        now = time.time()
         if now - self.last_command < self.min_command_interval:
             return
         
-        try:
-            # Use smooth transitions for natural flow
-            cmd = json.dumps({
-                'id': self.cmd_id,
-                'method': 'set_hsv',
-                'params': [hue, sat, 'smooth', 50]
-            })
-            self.music_conn.send((cmd + '\r\n').encode())
+        # Skip commands whose quantized values haven't changed, but still
+        # resend everything periodically
+        hsv = (hue, sat, bright)
+        last = self.led.last_hsv
+        refresh = last is None or now - self.last_refresh >= self.refresh_interval
+        if not refresh and hsv == last:
+            return
+        
+        # Use smooth transitions for natural flow
+        # Fixed schema, so format directly instead of json.dumps
+        # Both commands go out in a single write
+        payload = ''
+        send_color = refresh or (hue, sat) != last[:2]
+        send_bright = refresh or bright != last[2]
+        if send_color:
+            payload += (f'{{"id":{self.cmd_id},"method":"set_hsv",'
+                        f'"params":[{hue},{sat},"smooth",50]}}\r\n')
             self.cmd_id += 1
-            
-            cmd = json.dumps({
-                'id': self.cmd_id,
-                'method': 'set_bright',
-                'params': [bright, 'smooth', 50]
-            })
-            self.music_conn.send((cmd + '\r\n').encode())
+        
+        if send_bright:
+            payload += (f'{{"id":{self.cmd_id},"method":"set_bright",'
+                        f'"params":[{bright},"smooth",50]}}\r\n')
             self.cmd_id += 1
-            
-            self.last_command = now
-        except Exception as e:
-            print(f"Send error: {e}", flush=True)
-            self.running = False
+        
+        self.led.last_hsv = hsv
+        self._enqueue(payload.encode('ascii'))
+        self.last_command = now
+        if send_color and send_bright:
+            self.last_refresh = now
+    
+    def _enqueue(self, item):
+        """Queue commands for the sender thread, dropping the oldest if full"""
+        try:
+            self._tx_q.put_nowait(item)
+        except queue.Full:
+            try:
+                self._tx_q.get_nowait()
+                # The dropped payload may hold the only command for a value
+                # the light never received; force a full resend next frame
+                self.led.last_hsv = None
+            except queue.Empty:
+                pass
+            self._tx_q.put_nowait(item)
+    
+    def _send_loop(self):
+        """Sender thread: write queued commands to the music connection"""
+        while True:
+            payload = self._tx_q.get()
+            if payload is None:
+                break
+            try:
+                self.music_conn.sendall(payload)
+            except Exception as e:
+                print(f"Send error: {e}", flush=True)
+                self.running = False
+                break
     
     def process_audio(self, audio_data):
-        """Process audio frame and update light"""
+        """Process BATCH_FRAMES hops of audio and update light"""
+        hops = HOP_SIZE * BATCH_FRAMES
+        
         # Convert to mono float
         audio = np.frombuffer(audio_data, dtype=np.float32)
         
-        # If stereo, convert to mono
-        if len(audio) == CHUNK_SIZE * 2:
-            audio = audio.reshape(-1, 2).mean(axis=1)
+        # If stereo, convert to mono (samples are interleaved L/R)
+        if len(audio) == hops * 2:
+            audio = 0.5 * (audio[0::2] + audio[1::2])
         
-        if len(audio) < CHUNK_SIZE:
+        if len(audio) < hops:
             return
         
-        audio = audio[:CHUNK_SIZE]
+        if BATCH_FRAMES == 1:
+            # Slide the analysis window forward by one hop
+            frame = self.frame
+            frame[:-HOP_SIZE] = frame[HOP_SIZE:]
+            frame[-HOP_SIZE:] = audio[:HOP_SIZE]
+            self.process_features(self.features.process(frame))
+            return
+        
+        # Overlapping frames ending at each hop, analyzed as one batch
+        buf = np.concatenate((self.frame[HOP_SIZE:], audio[:hops]))
+        frames = np.lib.stride_tricks.sliding_window_view(buf, CHUNK_SIZE)[::HOP_SIZE]
+        self.frame[:] = buf[-CHUNK_SIZE:]
+        for feat in self.features.process_batch(frames):
+            self.process_features(feat)
+    
+    def process_features(self, feat):
+        """Run beat detection, pattern analysis and LED control for one frame"""
+        now = self.clock_start + self.frame_idx * HOP_SIZE / SAMPLE_RATE
+        self.frame_idx += 1
         
-        # Extract features
-        feat = self.features.process(audio)
         if feat is None:
             return
         
+        # Silence: let the beat pulse fade and leave the light as it is
+        if feat['silent']:
+            self.led.beat_pulse *= BEAT_PULSE_DECAY
+            return
+        
         # Beat detection
-        is_beat, beat_strength = self.beat_detector.detect(feat['rms'])
+        is_beat, beat_strength = self.beat_detector.detect(feat['rms'], now)
         
         # Pattern analysis
-        pattern_state = self.pattern.process(feat, is_beat, beat_strength)
+        pattern_state = self.pattern.process(feat, is_beat, beat_strength, now)
         
         # LED control
         hue, sat, bright = self.led.update(feat, pattern_state, is_beat, beat_strength)
         
         # Send to light
-        self.send_hsv(hue, sat, bright)
+        self.send_hsv(hue, sat, bright, now)
         
         # Debug output on beats
-        if int(time.time() * 2) % 2 == 0 and is_beat:
+        if int(now * 2) % 2 == 0 and is_beat:
             mode_name = "SpectrumFlow" if pattern_state['mode'] == PatternMode.SPECTRUM_FLOW else "EnergyPulse"
             print(f"[{mode_name}] H:{hue:3d} S:{sat:3d} B:{bright:3d} | "
                   f"Bass:{feat['bass']:.2f} Mid:{feat['mid']:.2f} Hi:{feat['high']:.2f} | "
@@ -602,12 +852,12 @@ class YeelightMusicSync:
                 rate=SAMPLE_RATE,
                 input=True,
                 input_device_index=loopback_device['index'],
-                frames_per_buffer=CHUNK_SIZE
+                frames_per_buffer=HOP_SIZE * BATCH_FRAMES
             )
             
             while self.running:
                 try:
-                    data = stream.read(CHUNK_SIZE, exception_on_overflow=False)
+                    data = stream.read(HOP_SIZE * BATCH_FRAMES, exception_on_overflow=False)
                     self.process_audio(data)
                 except KeyboardInterrupt:
                     break